@@ -7,28 +7,463 @@ and prepares them for external publication by cleaning frontmatter and content.
 """
 
 import argparse
+import concurrent.futures
+import fnmatch
+import hashlib
+import io
+import mmap
+import os
+import pickle
 import re
 import shutil
 import sys
+import tempfile
+import textwrap
 import yaml
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from collections import Counter
+from pathlib import Path, PurePath
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+# Regex engines selectable with --engine; optional ones fall back to `re`
+ENGINES = ('re', 're2', 'hyperscan')
+
+# Files at least this large are matched through a read-only memory map
+MMAP_THRESHOLD = 64 * 1024
+
+# Input files hinted for readahead ahead of the one being cleaned, per process
+PREFETCH_WINDOW = 16
+
+# Smallest batch worth starting worker processes for when --jobs is not given
+MIN_PARALLEL_TASKS = 16
+
+# Task chunks per pool worker: enough to balance uneven files, few enough to amortize IPC
+CHUNKS_PER_WORKER = 4
+
+# Mapped files containing these bytes are cleaned through the text path instead:
+# CR because text mode normalizes line endings, and non-ASCII bytes because bytes
+# patterns (and re2 even for str) only treat ASCII as \s, \d, \w and \b (e.g.
+# NBSP phone separators)
+_CR_OR_NON_ASCII_BYTE = re.compile(rb'[\r\x80-\xff]')
+
+
+# Valid NANP area codes: NXX with N in 2-9, excluding the reserved X9X block and N11 service codes
+_NANP_AREA_CODES = frozenset(
+    f"{first}{second}{third}"
+    for first in "23456789" for second in "012345678" for third in "0123456789"
+    if not (second == "1" and third == "1")
+)
+
+# IPv4 ranges that identify no one: "this network", loopback and the RFC 5737 documentation nets
+_NON_PII_IP_RANGES = (
+    (0x00000000, 0x00FFFFFF),  # 0.0.0.0/8
+    (0x7F000000, 0x7FFFFFFF),  # 127.0.0.0/8
+    (0xC0000200, 0xC00002FF),  # 192.0.2.0/24
+    (0xC6336400, 0xC63364FF),  # 198.51.100.0/24
+    (0xCB007100, 0xCB0071FF),  # 203.0.113.0/24
+)
+
+
+def _is_phone_number(text: str, following: str) -> bool:
+    """Reject phone matches that run into more digits or use an invalid NANP area code."""
+    if following.isdigit():
+        return False
+    digits = ''.join(ch for ch in text if ch.isdigit())
+    if len(digits) == 11 and digits[0] == '1':
+        digits = digits[1:]
+    # Only judge 10-digit NANP numbers; anything else custom rules match is kept as PII
+    return len(digits) != 10 or digits[:3] in _NANP_AREA_CODES
+
+
+def _is_ip_address(text: str, following: str) -> bool:
+    """Reject dotted quads that are not addresses (octet > 255) or identify no one."""
+    try:
+        octets = [int(part) for part in text.split('.')]
+    except ValueError:
+        return True
+    if len(octets) != 4:
+        return True
+    if any(octet > 255 for octet in octets):
+        return False
+    value = (octets[0] << 24) | (octets[1] << 16) | (octets[2] << 8) | octets[3]
+    return not any(start <= value <= end for start, end in _NON_PII_IP_RANGES)
+
+
+def _is_ssn(text: str, following: str) -> bool:
+    """Reject numbers the SSA never issues (area 000/666/9xx, group 00, serial 0000)."""
+    digits = ''.join(ch for ch in text if ch.isdigit())
+    if len(digits) != 9:
+        return True
+    area, group, serial = digits[:3], digits[3:5], digits[5:]
+    return not (area in ('000', '666') or area[0] == '9' or group == '00' or serial == '0000')
+
+
+# Rule syntax whose meaning depends on the rule being the whole pattern: numbered or
+# named backreferences, conditionals, named groups (which could collide once fused)
+# and global inline flags. Escaped backslashes may trip it too, which only costs a
+# separate pass.
+_UNFUSABLE_SYNTAX = re.compile(r'\\[1-9]|\(\?P[=<]|\(\?<\w|\(\?\(|\(\?[aiLmsux]+\)')
+
+# Post-match validators by rule name; a False result leaves the match unredacted
+_VALIDATORS = {
+    'phone': _is_phone_number,
+    'ip_address': _is_ip_address,
+    'ssn': _is_ssn,
+}
+
+
+def _rules_cache_dir() -> Path:
+    """Return the directory used to cache parsed rules files."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(cache_home) / 'mkdocs_material_prep'
+
+
+def _iter_files(root: str, pattern: str) -> Iterator[os.DirEntry]:
+    """Recursively yield files under root whose name matches pattern.
+    
+    Uses os.scandir so file/directory checks come from the cached d_type
+    rather than a stat per entry. Symlinked directories are not followed and
+    unreadable directories are skipped, matching Path.rglob. As with rglob,
+    patterns containing a separator (e.g. ``guides/*.md``) match the trailing
+    components of the path relative to root, and matching follows the
+    platform's case sensitivity.
+    """
+    match_path = any(sep and sep in pattern for sep in ('/', os.sep, os.altsep))
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                        continue
+                    if match_path:
+                        matched = PurePath(os.path.relpath(entry.path, root)).match(pattern)
+                    else:
+                        matched = fnmatch.fnmatch(entry.name, pattern)
+                    if matched and entry.is_file():
+                        yield entry
+        except OSError:
+            continue
+
+
+def _entry_size(entry: os.DirEntry) -> int:
+    """Return a directory entry's file size, or 0 if it cannot be stat'ed."""
+    try:
+        return entry.stat().st_size
+    except OSError:
+        return 0
+
+
+def _write_bytes_fast(path: Path, data: bytes) -> None:
+    """Write bytes straight to a file descriptor, bypassing the io buffering layer."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        with memoryview(data) as view:
+            written = 0
+            while written < len(view):
+                written += os.write(fd, view[written:])
+    finally:
+        os.close(fd)
+
+
+def _replaceable(path: Path, links: int = 1) -> bool:
+    """Return whether a resolved file can be swapped for a new one without changing behavior.
+    
+    Needs write access to the directory and to the file itself (which a
+    truncating write would need too), exactly ``links`` hard links so no
+    other link is split off by the rename, and, unless running as root, a
+    file owned by us in one of our groups so the new file can take the same
+    owner.
+    """
+    if not os.access(path.parent, os.W_OK | os.X_OK) or not os.access(path, os.W_OK):
+        return False
+    try:
+        stat = path.stat()
+    except OSError:
+        return False
+    if stat.st_nlink != links:
+        return False
+    if not hasattr(os, 'geteuid') or os.geteuid() == 0:
+        return True
+    return stat.st_uid == os.geteuid() and (stat.st_gid == os.getegid() or stat.st_gid in os.getgroups())
+
+
+def _copy_xattrs(src: Path, dst: str) -> None:
+    """Copy extended attributes where the platform supports them, ignoring failures."""
+    if not hasattr(os, 'listxattr'):
+        return
+    try:
+        names = os.listxattr(src)
+    except OSError:
+        return
+    for name in names:
+        try:
+            os.setxattr(dst, name, os.getxattr(src, name))
+        except OSError:
+            pass
+
+
+def _prefetch_files(paths: List[Path]) -> None:
+    """Hint the kernel to start reading files before they are processed.
+    
+    POSIX_FADV_WILLNEED queues asynchronous readahead and returns at once,
+    so disk reads overlap with cleaning. Errors are ignored; this is only a
+    hint.
+    """
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _prefetched(tasks: List[Tuple[Path, Optional[Path]]]) -> Iterator[Tuple[Path, Optional[Path]]]:
+    """Yield tasks in order, hinting readahead for input files PREFETCH_WINDOW tasks ahead.
+    
+    The window is bounded so hinted files are still in the page cache when
+    they are processed, even for trees larger than memory. Runs in whichever
+    process cleans the files, so no thread is started before a fork.
+    """
+    if not hasattr(os, 'posix_fadvise') or len(tasks) < 2:
+        yield from tasks
+        return
+    
+    _prefetch_files([task[0] for task in tasks[1:PREFETCH_WINDOW]])
+    for index, task in enumerate(tasks):
+        if index + PREFETCH_WINDOW < len(tasks):
+            _prefetch_files([tasks[index + PREFETCH_WINDOW][0]])
+        yield task
+
+
+class _HyperscanMatch:
+    """Minimal stand-in for ``re.Match`` built from a Hyperscan match span."""
+    
+    __slots__ = ('string', 'lastgroup', '_start', '_end')
+    
+    def __init__(self, string, lastgroup: str, start: int, end: int):
+        self.string = string
+        self.lastgroup = lastgroup
+        self._start = start
+        self._end = end
+    
+    def group(self):
+        return self.string[self._start:self._end]
+    
+    def start(self) -> int:
+        return self._start
+    
+    def end(self) -> int:
+        return self._end
+    
+    def span(self) -> Tuple[int, int]:
+        return self._start, self._end
+
+
+class _HyperscanPattern:
+    """Hyperscan block-mode database exposing the subset of ``re.Pattern`` we use.
+    
+    All patterns are compiled into one database and scanned in a single pass.
+    Hyperscan reports every match end, so spans are resolved the way an
+    alternation would: leftmost start first, then pattern order, then longest.
+    A ``utf8`` database scans str input; otherwise input is raw bytes.
+    """
+    
+    def __init__(self, patterns: Dict[str, str], utf8: bool = True):
+        self._groups = list(patterns)
+        count = len(self._groups)
+        flags = hyperscan.HS_FLAG_SOM_LEFTMOST
+        if utf8:
+            flags |= hyperscan.HS_FLAG_UTF8
+        self._db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        self._db.compile(
+            expressions=[pattern.encode('utf-8') for pattern in patterns.values()],
+            ids=list(range(count)),
+            elements=count,
+            flags=[flags] * count,
+        )
+        self._patterns = patterns
+        self._fallback = None
+        self._last_string = None
+        self._last_spans = []
+        self._last_data = None
+        self._last_data_spans = []
+    
+    def _spans(self, data: bytes) -> List[Tuple[int, int, int]]:
+        """Scan data and return non-overlapping (start, end, id) byte spans.
+        
+        Only the leftmost start of each match end is reported, so a match
+        whose leftmost start lies inside an accepted span may still match
+        from a later start, as re finds when resuming after that span. Those
+        are recovered with an re search from the end of the span.
+        """
+        hits = []
+        
+        def on_match(pattern_id, start, end, flags, context):
+            if end > start:
+                hits.append((start, pattern_id, -end))
+        
+        self._db.scan(data, match_event_handler=on_match)
+        hits.sort()
+        
+        spans = []
+        position = 0
+        searched = -1
+        for start, pattern_id, neg_end in hits:
+            if start >= position:
+                spans.append((start, -neg_end, pattern_id))
+                position = -neg_end
+            elif -neg_end > position and searched < position:
+                searched = position
+                span = self._search_from(data, position)
+                if span is not None:
+                    spans.append(span)
+                    position = span[1]
+        return spans
+    
+    def _search_from(self, data: bytes, position: int) -> Optional[Tuple[int, int, int]]:
+        """Return the first non-empty (start, end, id) span at or after position, using re."""
+        if self._fallback is None:
+            fused = '|'.join(f"(?P<{group}>{pattern})" for group, pattern in self._patterns.items())
+            self._fallback = re.compile(fused.encode('utf-8'))
+        match = self._fallback.search(data, position)
+        if match is None or match.end() == match.start():
+            return None
+        return match.start(), match.end(), self._groups.index(match.lastgroup)
+    
+    def _text_spans(self, string: str) -> List[Tuple[int, int, int]]:
+        """Return match spans for str input in character offsets.
+        
+        The spans for the last string are kept, so a search probe followed by
+        sub/finditer on the same text scans it only once.
+        """
+        if string is self._last_string:
+            return self._last_spans
+        
+        data = string.encode('utf-8')
+        spans = self._spans(data)
+        if len(data) != len(string):
+            # Non-ASCII text: convert byte offsets to character offsets incrementally
+            char_spans = []
+            byte_pos = char_pos = 0
+            for start, end, pattern_id in spans:
+                char_start = char_pos + len(data[byte_pos:start].decode('utf-8'))
+                char_end = char_start + len(data[start:end].decode('utf-8'))
+                byte_pos, char_pos = end, char_end
+                char_spans.append((char_start, char_end, pattern_id))
+            spans = char_spans
+        
+        self._last_string, self._last_spans = string, spans
+        return spans
+    
+    def _data_spans(self, data) -> List[Tuple[int, int, int]]:
+        """Return match spans for bytes-like input, reusing the last scan of the same object.
+        
+        A search probe followed by sub on a mapped file body scans it once.
+        The reference is dropped by subn, so buffer views are not kept alive.
+        """
+        if data is not self._last_data:
+            self._last_data, self._last_data_spans = data, self._spans(data)
+        return self._last_data_spans
+    
+    def finditer(self, string):
+        spans = self._text_spans(string) if isinstance(string, str) else self._data_spans(string)
+        for start, end, pattern_id in spans:
+            yield _HyperscanMatch(string, self._groups[pattern_id], start, end)
+    
+    def search(self, string) -> Optional[_HyperscanMatch]:
+        return next(self.finditer(string), None)
+    
+    def subn(self, repl, string):
+        text = isinstance(string, str)
+        parts = []
+        position = 0
+        for match in self.finditer(string):
+            parts.append(string[position:match.start()])
+            parts.append(repl(match) if callable(repl) else repl)
+            position = match.end()
+        self._last_data = None
+        if not parts:
+            return (string if text else bytes(string)), 0
+        count = len(parts) // 2
+        parts.append(string[position:])
+        return ('' if text else b'').join(parts), count
+    
+    def sub(self, repl, string):
+        return self.subn(repl, string)[0]
 
 
 class MarkdownProcessor:
     """Processes markdown files to remove PII and prepare for publication."""
     
     def __init__(self, rules_file: str = "default_rules.yaml", 
-                 generic_contact: str = "contact@example.com", verbose: bool = False):
+                 generic_contact: str = "contact@example.com", verbose: bool = False,
+                 engine: str = "re", rules: Optional[Dict] = None):
         self.generic_contact = generic_contact
         self.verbose = verbose
-        self.rules = self._load_rules(rules_file)
+        self.engine = self._select_engine(engine)
+        # Pre-parsed rules (as handed to pool workers) skip loading rules_file
+        self.rules = rules if rules is not None else self._load_rules(rules_file)
+        self._compile_patterns()
+        self._clean_content_impl = self._build_cleaner(self._fused, self._dispatch, as_bytes=False,
+                                                       unicode_pattern=self._fused_re)
+        self._clean_bytes_impl = self._build_cleaner(self._fused_bytes, self._dispatch_bytes, as_bytes=True)
+        self._fm_remove_set = frozenset(self.rules.get('frontmatter_remove') or [])
+        # Frontmatter dump buffer and settings, reused for every file this processor handles
+        self._yaml_buf = io.StringIO()
+        self._dump_options = {'Dumper': _Dumper, 'default_flow_style': False, 'sort_keys': False}
+        
+        # Degenerate rule sets: install no-op cleaners so the per-file path skips them
+        if not self._fm_remove_set:
+            self._clean_frontmatter = lambda frontmatter: (frontmatter or {}, False)
+        if self._fused is None and not self._separate:
+            self._clean_content = lambda content: content
         
+    def _select_engine(self, engine: str) -> str:
+        """Resolve the requested regex engine, falling back to `re` if unavailable."""
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown regex engine: {engine}")
+        if engine == 're2' and re2 is None:
+            print("Warning: re2 engine requested but google-re2 is not installed, using re")
+            return 're'
+        if engine == 'hyperscan' and hyperscan is None:
+            print("Warning: hyperscan engine requested but hyperscan is not installed, using re")
+            return 're'
+        return engine
+    
     def _load_rules(self, rules_file: str) -> Dict:
-        """Load PII detection rules from YAML file."""
+        """Load PII detection rules from YAML file, using a parsed-rules cache."""
         try:
+            st = os.stat(rules_file)
+            cache_path = self._rules_cache_path(rules_file, st)
+            rules = self._read_rules_cache(cache_path)
+            if rules is not None:
+                return rules
+            
             with open(rules_file, 'r') as f:
-                return yaml.safe_load(f)
+                rules = yaml.load(f, Loader=_Loader)
+            self._write_rules_cache(cache_path, rules)
+            return rules
         except FileNotFoundError:
             if self.verbose:
                 print(f"Warning: Rules file {rules_file} not found, using minimal defaults")
@@ -37,6 +472,55 @@ class MarkdownProcessor:
             print(f"Error parsing rules file: {e}")
             return self._get_default_rules()
     
+    def _rules_cache_path(self, rules_file: str, st: os.stat_result) -> Path:
+        """Return the cache path for a rules file, keyed by path, mtime and size.
+        
+        The name is ``rules-<path digest>-<version digest>.pkl`` so entries for
+        earlier versions of the same rules file can be found and pruned.
+        """
+        path_digest = hashlib.blake2b(os.path.abspath(rules_file).encode('utf-8'), digest_size=8).hexdigest()
+        version_digest = hashlib.blake2b(f"{st.st_mtime_ns}\0{st.st_size}".encode('utf-8'), digest_size=8).hexdigest()
+        return _rules_cache_dir() / f"rules-{path_digest}-{version_digest}.pkl"
+    
+    def _read_rules_cache(self, cache_path: Path) -> Optional[Dict]:
+        """Return cached parsed rules, or None on a cache miss."""
+        try:
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            # Missing, unreadable or corrupt caches are just misses
+            return None
+    
+    def _write_rules_cache(self, cache_path: Path, rules: Dict) -> None:
+        """Atomically store parsed rules in the cache, ignoring I/O errors.
+        
+        Entries for earlier versions of the same rules file are removed.
+        """
+        if rules is None:
+            return
+        temp_name = None
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('wb', dir=cache_path.parent, delete=False) as f:
+                temp_name = f.name
+                pickle.dump(rules, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, cache_path)
+            temp_name = None
+            
+            path_prefix = cache_path.name.rsplit('-', 1)[0]
+            for stale in cache_path.parent.glob(f"{path_prefix}-*.pkl"):
+                if stale != cache_path:
+                    stale.unlink()
+        except OSError as e:
+            if self.verbose:
+                print(f"Warning: Could not cache rules file: {e}")
+        finally:
+            if temp_name is not None:
+                try:
+                    os.unlink(temp_name)
+                except OSError:
+                    pass
+    
     def _get_default_rules(self) -> Dict:
         """Return minimal default rules if YAML file is not available."""
         return {
@@ -50,101 +534,400 @@ class MarkdownProcessor:
             }
         }
     
-    def _extract_frontmatter(self, content: str) -> Tuple[Optional[Dict], str]:
-        """Extract YAML frontmatter from markdown content."""
+    def _compile_patterns(self) -> None:
+        """Fuse all PII patterns into a single alternation of named groups.
+        
+        Each pattern gets a positional group name (rule names need not be
+        valid identifiers), mapped back to the rule name and its replacement.
+        Sets ``_fused`` for str content and ``_fused_bytes`` for memory-mapped
+        content (None when the patterns cannot be matched as bytes).
+        ``_fused_re`` is the same alternation compiled with ``re``, used for
+        non-ASCII text where the selected engine's classes are ASCII-only.
+        
+        Every rule is first compiled on its own so invalid rules fail with
+        their name. Rules that would change meaning inside the alternation
+        (see _UNFUSABLE_SYNTAX) are kept in ``_separate`` and matched one at a
+        time with ``re``, as all rules were before fusing.
+        """
+        self._pattern_names = {}
+        self._replacements = {}
+        self._separate = []
+        patterns = {}
+        for index, (pattern_name, pattern) in enumerate((self.rules.get('pii_patterns') or {}).items()):
+            group = f"_p{index}"
+            self._pattern_names[group] = pattern_name
+            # Emails are replaced with the generic contact, everything else is redacted
+            self._replacements[group] = self.generic_contact if pattern_name == 'email' else '[REDACTED]'
+            try:
+                compiled = re.compile(pattern)
+            except (re.error, TypeError) as e:
+                raise ValueError(f"Invalid PII pattern '{pattern_name}': {e}") from e
+            if _UNFUSABLE_SYNTAX.search(pattern):
+                self._separate.append((group, compiled))
+            else:
+                patterns[group] = pattern
+        self._byte_replacements = {group: replacement.encode('utf-8')
+                                   for group, replacement in self._replacements.items()}
+        self._validators = {group: _VALIDATORS[pattern_name]
+                            for group, pattern_name in self._pattern_names.items()
+                            if pattern_name in _VALIDATORS}
+        
+        self._fused = self._fused_bytes = self._fused_re = None
+        if not patterns:
+            return
+        
+        self._fused = self._compile_fused(patterns, text=True)
+        if self.engine != 're':
+            # RE2 and Hyperscan treat \s, \d, \w and \b as ASCII-only even for str
+            # input (Hyperscan's UCP mode rejects \b, so it cannot be enabled)
+            self._fused_re = re.compile('|'.join(f"(?P<{group}>{pattern})" for group, pattern in patterns.items()))
+        else:
+            self._fused_re = self._fused
+        if self._separate:
+            # Separately matched rules only have str patterns, so they rule out the bytes path
+            pass
+        elif self.engine == 're2':
+            # RE2 matches UTF-8 bytes natively with the same compiled pattern
+            self._fused_bytes = self._fused
+        elif all(pattern.isascii() for pattern in patterns.values()):
+            # Bytes patterns have ASCII-only classes, so only ASCII rules qualify
+            try:
+                self._fused_bytes = self._compile_fused(patterns, text=False)
+            except re.error:
+                self._fused_bytes = None
+    
+    def _compile_fused(self, patterns: Dict[str, str], text: bool):
+        """Compile the named-group alternation with the selected engine."""
+        if self.engine == 'hyperscan':
+            try:
+                return _HyperscanPattern(patterns, utf8=text)
+            except hyperscan.error as e:
+                print(f"Warning: PII patterns not supported by hyperscan ({e}), using re")
+                self.engine = 're'
+        
+        fused = '|'.join(f"(?P<{group}>{pattern})" for group, pattern in patterns.items())
+        if self.engine == 're2':
+            try:
+                return re2.compile(fused)
+            except re2.error as e:
+                print(f"Warning: PII patterns not supported by re2 ({e}), using re")
+                self.engine = 're'
+        return re.compile(fused if text else fused.encode('ascii'))
+    
+    def _dispatch(self, match: re.Match) -> str:
+        """Return the replacement for whichever PII pattern matched."""
+        return self._replace(match.lastgroup, match)
+    
+    def _rule_dispatch(self, group: str):
+        """Return a dispatch callback for a rule matched on its own, outside the fused pattern."""
+        def dispatch(match: re.Match) -> str:
+            return self._replace(group, match)
+        return dispatch
+    
+    def _replace(self, group: str, match: re.Match) -> str:
+        """Return the replacement for a match of the given rule group.
+        
+        Matches rejected by the pattern's validator are returned unchanged.
+        """
+        validator = self._validators.get(group)
+        if validator is not None:
+            text = match.group()
+            if not validator(text, match.string[match.end():match.end() + 1]):
+                return text
+        return self._replacements[group]
+    
+    def _dispatch_bytes(self, match: re.Match) -> bytes:
+        """Return the bytes replacement for whichever PII pattern matched."""
+        group = match.lastgroup
+        validator = self._validators.get(group)
+        if validator is not None:
+            text = bytes(match.group())
+            following = bytes(match.string[match.end():match.end() + 1])
+            if not validator(text.decode('latin-1'), following.decode('latin-1')):
+                return text
+        return self._byte_replacements[group]
+    
+    def _split_frontmatter(self, content: str) -> Tuple[Optional[str], str]:
+        """Split markdown content into raw frontmatter text and body."""
         if not content.startswith('---\n'):
             return None, content
+        
+        # Find the end of frontmatter
+        end_marker = content.find('\n---\n', 4)
+        if end_marker == -1:
+            return None, content
+        
+        return content[4:end_marker], content[end_marker + 5:]
+    
+    def _contains_pii(self, text: str) -> bool:
+        """Return whether any PII pattern matches text."""
+        fused = self._fused if text.isascii() else self._fused_re
+        if fused is not None and fused.search(text) is not None:
+            return True
+        return any(compiled.search(text) is not None for group, compiled in self._separate)
+    
+    def _has_removable_fields(self, frontmatter_text: str) -> bool:
+        """Cheap substring check for whether frontmatter may hold fields to remove.
+        
+        Deliberately conservative: any occurrence of a field name (quoted,
+        spaced or in a flow mapping) forces a full YAML parse.
+        """
+        return any(field in frontmatter_text for field in self.rules.get('frontmatter_remove') or [])
+    
+    def _extract_frontmatter(self, content: str) -> Tuple[Optional[Dict], Optional[str], str]:
+        """Extract YAML frontmatter from markdown content.
+        
+        Returns the parsed frontmatter, its original text and the body.
+        """
+        frontmatter_text, body = self._split_frontmatter(content)
+        if frontmatter_text is None:
+            return None, None, content
             
         try:
-            # Find the end of frontmatter
-            end_marker = content.find('\n---\n', 4)
-            if end_marker == -1:
-                return None, content
-                
-            frontmatter_text = content[4:end_marker]
-            body = content[end_marker + 5:]
-            
-            frontmatter = yaml.safe_load(frontmatter_text)
-            return frontmatter, body
+            frontmatter = yaml.load(frontmatter_text, Loader=_Loader)
+            return frontmatter, frontmatter_text, body
         except yaml.YAMLError:
             if self.verbose:
                 print("Warning: Invalid frontmatter found, skipping frontmatter processing")
-            return None, content
+            return None, None, content
     
-    def _clean_frontmatter(self, frontmatter: Dict) -> Dict:
-        """Remove PII fields from frontmatter."""
+    def _clean_frontmatter(self, frontmatter: Dict) -> Tuple[Dict, bool]:
+        """Remove PII fields from frontmatter, reporting whether any were removed.
+        
+        The dict is modified in place; it is the caller's own parse result.
+        Frontmatter that is valid YAML but not a mapping is returned unchanged.
+        """
         if not frontmatter:
-            return {}
+            return {}, False
+        if not isinstance(frontmatter, dict):
+            return frontmatter, False
             
-        cleaned = frontmatter.copy()
-        fields_to_remove = self.rules.get('frontmatter_remove', [])
+        fields_to_remove = [field for field in frontmatter if field in self._fm_remove_set]
         
         for field in fields_to_remove:
-            if field in cleaned:
-                if self.verbose:
-                    print(f"  Removing frontmatter field: {field}")
-                del cleaned[field]
+            if self.verbose:
+                print(f"  Removing frontmatter field: {field}")
+            frontmatter.pop(field, None)
         
-        return cleaned
+        return frontmatter, bool(fields_to_remove)
     
-    def _clean_content(self, content: str) -> str:
-        """Remove PII patterns from markdown content."""
-        cleaned_content = content
-        pii_patterns = self.rules.get('pii_patterns', {})
+    def _substitute(self, pattern, dispatch, content, group: Optional[str] = None):
+        """Replace all PII matches in one pass, reporting per-pattern counts in verbose mode.
         
-        for pattern_name, pattern in pii_patterns.items():
-            matches = re.findall(pattern, cleaned_content)
-            if matches:
-                if self.verbose:
-                    print(f"  Found {len(matches)} {pattern_name} pattern(s)")
-                
-                if pattern_name == 'email':
-                    # Replace emails with generic contact
-                    cleaned_content = re.sub(pattern, self.generic_contact, cleaned_content)
-                else:
-                    # Remove other PII patterns
-                    cleaned_content = re.sub(pattern, '[REDACTED]', cleaned_content)
+        ``group`` names the rule for separately matched patterns; fused
+        matches are attributed by their ``lastgroup``.
+        """
+        if not self.verbose:
+            return pattern.sub(dispatch, content)
+        
+        counts = Counter()
+        
+        def counting_dispatch(match):
+            counts[group or match.lastgroup] += 1
+            return dispatch(match)
         
+        cleaned_content, total = pattern.subn(counting_dispatch, content)
+        if total:
+            for group, count in counts.items():
+                print(f"  Found {count} {self._pattern_names[group]} pattern(s)")
         return cleaned_content
     
-    def _reconstruct_markdown(self, frontmatter: Optional[Dict], content: str) -> str:
-        """Reconstruct markdown file with cleaned frontmatter and content."""
+    def _build_cleaner(self, pattern, dispatch, as_bytes: bool, unicode_pattern=None):
+        """Generate a content cleaner specialized for this processor's rules.
+        
+        The pattern's bound methods and the dispatch callback become default
+        arguments of the generated function, so the per-file path runs on
+        local lookups only, with engine and verbosity branches resolved here.
+        Non-ASCII str content is matched with ``unicode_pattern`` when it
+        differs from ``pattern``. Separately matched rules run after the fused
+        pass (str content only).
+        """
+        if pattern is None:
+            clean = lambda content: content
+        else:
+            clean = self._generate_cleaner(pattern, dispatch, as_bytes)
+            if unicode_pattern is not None and unicode_pattern is not pattern:
+                ascii_clean = clean
+                unicode_clean = self._generate_cleaner(unicode_pattern, dispatch, as_bytes)
+                
+                def clean(content):
+                    return ascii_clean(content) if content.isascii() else unicode_clean(content)
+        
+        if as_bytes or not self._separate:
+            return clean
+        
+        fused_clean = clean
+        separate = [(compiled, self._rule_dispatch(group), group) for group, compiled in self._separate]
+        substitute = self._substitute
+        
+        def clean(content):
+            content = fused_clean(content)
+            for compiled, rule_dispatch, group in separate:
+                if compiled.search(content) is not None:
+                    content = substitute(compiled, rule_dispatch, content, group)
+            return content
+        
+        return clean
+    
+    def _generate_cleaner(self, pattern, dispatch, as_bytes: bool):
+        """Generate the fused-pattern cleaner source and exec it."""
+        copy_view = as_bytes and self.engine == 're2'
+        source = textwrap.dedent(f"""\
+            def clean(content, search=pattern.search, sub=pattern.sub, dispatch=dispatch,
+                      substitute=substitute, pattern=pattern):
+                {"content = bytes(content)  # re2's sub rejects buffer views" if copy_view else "pass"}
+                if search(content) is None:
+                    return {"bytes(content)" if as_bytes else "content"}
+                return {"substitute(pattern, dispatch, content)" if self.verbose else "sub(dispatch, content)"}
+            """)
+        namespace = {'pattern': pattern, 'dispatch': dispatch, 'substitute': self._substitute}
+        exec(source, namespace)
+        return namespace['clean']
+    
+    def _clean_content(self, content: str) -> str:
+        """Remove PII patterns from markdown content."""
+        return self._clean_content_impl(content)
+    
+    def _clean_content_bytes(self, content) -> bytes:
+        """Remove PII patterns from a bytes-like view of UTF-8 markdown content."""
+        return self._clean_bytes_impl(content)
+    
+    def _reconstruct_markdown(self, frontmatter: Optional[Dict], content: str,
+                              frontmatter_text: Optional[str] = None, changed: bool = True) -> str:
+        """Reconstruct markdown file with cleaned frontmatter and content.
+        
+        Unchanged frontmatter is re-emitted from its original text instead of
+        being dumped again, which would requote and reformat it.
+        """
+        if not changed and frontmatter_text is not None:
+            return f"---\n{frontmatter_text}\n---\n{content}"
+        
         if not frontmatter:
             return content
             
         # Convert frontmatter back to YAML
-        yaml_content = yaml.dump(frontmatter, default_flow_style=False, sort_keys=False)
+        self._yaml_buf.seek(0)
+        self._yaml_buf.truncate()
+        yaml.dump(frontmatter, self._yaml_buf, **self._dump_options)
+        yaml_content = self._yaml_buf.getvalue()
         return f"---\n{yaml_content}---\n{content}"
     
+    def _clean_markdown(self, content: str) -> str:
+        """Clean frontmatter and body of a markdown document."""
+        frontmatter_text, body = self._split_frontmatter(content)
+        if (frontmatter_text is not None and not self._has_removable_fields(frontmatter_text)
+                and not self._contains_pii(frontmatter_text)):
+            # No removable field and no PII: keep the original frontmatter, skipping the
+            # YAML parse. Anything else takes the full path, which cleans the whole
+            # content when the frontmatter turns out to be invalid YAML.
+            return self._reconstruct_markdown(None, self._clean_content(body), frontmatter_text, changed=False)
+        
+        # Extract frontmatter and content
+        frontmatter, frontmatter_text, body = self._extract_frontmatter(content)
+        
+        # Clean frontmatter
+        cleaned_frontmatter, changed = self._clean_frontmatter(frontmatter)
+        
+        # Clean content
+        cleaned_body = self._clean_content(body)
+        
+        # Reconstruct the file
+        return self._reconstruct_markdown(cleaned_frontmatter, cleaned_body, frontmatter_text, changed)
+    
+    def _clean_mapped(self, input_path: Path) -> Optional[bytes]:
+        """Clean a large file through a read-only memory map.
+        
+        Only the frontmatter is decoded; the body is matched in place with the
+        bytes patterns. Returns None for files containing CR characters, which
+        the text path normalizes to LF, and for non-ASCII files, which need
+        Unicode-aware classes.
+        """
+        with open(input_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if _CR_OR_NON_ASCII_BYTE.search(mapped) is not None:
+                return None
+            
+            body_start = 0
+            if mapped[:4] == b'---\n':
+                end_marker = mapped.find(b'\n---\n', 4)
+                if end_marker != -1:
+                    body_start = end_marker + 5
+            
+            header = self._clean_markdown(mapped[:body_start].decode('utf-8')).encode('utf-8')
+            with memoryview(mapped) as view, view[body_start:] as body:
+                return header + self._clean_content_bytes(body)
+    
+    def _write_content(self, output_path: Path, content) -> None:
+        """Write cleaned str or bytes content to output_path."""
+        if isinstance(content, bytes):
+            _write_bytes_fast(output_path, content)
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+    
+    def _replace_file(self, path: Path, content) -> None:
+        """Replace a file with new content via a sibling temp file and rename.
+        
+        Symlinks are resolved first so the link is kept and its target is
+        rewritten. The original inode is never truncated, so in-place backups
+        may be hardlinks to it (see process_directory). Files that cannot be
+        replaced without changing behavior (see _replaceable) are rewritten
+        in place instead.
+        """
+        backup_path = path.with_suffix(path.suffix + '.bak')
+        path = Path(os.path.realpath(path))
+        try:
+            # A hardlinked in-place backup is the one extra link we expect
+            links = 2 if os.path.samefile(backup_path, path) else 1
+        except OSError:
+            links = 1
+        if not _replaceable(path, links):
+            self._write_content(path, content)
+            return
+        
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+        os.close(fd)
+        try:
+            self._write_content(Path(temp_name), content)
+            stat = path.stat()
+            shutil.copymode(path, temp_name)
+            if hasattr(os, 'chown'):
+                os.chown(temp_name, stat.st_uid, stat.st_gid)
+            _copy_xattrs(path, temp_name)
+            os.replace(temp_name, path)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+    
     def process_file(self, input_path: Path, output_path: Optional[Path] = None) -> bool:
-        """Process a single markdown file."""
+        """Process a single markdown file.
+        
+        Files of at least MMAP_THRESHOLD bytes are matched through a memory
+        map instead of being read and decoded in full.
+        """
         try:
-            # Read the file
-            with open(input_path, 'r', encoding='utf-8') as f:
-                original_content = f.read()
-            
             if self.verbose:
                 print(f"Processing: {input_path}")
             
-            # Extract frontmatter and content
-            frontmatter, body = self._extract_frontmatter(original_content)
-            
-            # Clean frontmatter
-            cleaned_frontmatter = self._clean_frontmatter(frontmatter)
-            
-            # Clean content
-            cleaned_body = self._clean_content(body)
+            final_content = None
+            if self._fused_bytes is not None and os.path.getsize(input_path) >= MMAP_THRESHOLD:
+                final_content = self._clean_mapped(input_path)
             
-            # Reconstruct the file
-            final_content = self._reconstruct_markdown(cleaned_frontmatter, cleaned_body)
+            if final_content is None:
+                # Read the file
+                with open(input_path, 'r', encoding='utf-8') as f:
+                    original_content = f.read()
+                
+                final_content = self._clean_markdown(original_content)
             
             # Determine output path
             if output_path is None:
                 output_path = input_path
             
             # Write the cleaned content
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(final_content)
+            if output_path == input_path:
+                self._replace_file(input_path, final_content)
+            else:
+                self._write_content(output_path, final_content)
             
             if self.verbose:
                 print(f"  Saved to: {output_path}")
@@ -155,16 +938,33 @@ class MarkdownProcessor:
             print(f"Error processing {input_path}: {e}")
             return False
     
+    def _worker_config(self) -> Dict:
+        """Return the picklable settings needed to rebuild this processor in a worker."""
+        return {
+            'generic_contact': self.generic_contact,
+            'verbose': self.verbose,
+            'engine': self.engine,
+            'rules': self.rules,
+        }
+    
     def process_directory(self, input_dir: Path, output_dir: Optional[Path] = None, 
                          pattern: str = "*.md", in_place: bool = False, 
-                         dry_run: bool = False) -> int:
-        """Process all markdown files in a directory."""
+                         dry_run: bool = False, jobs: Optional[int] = None) -> int:
+        """Process all markdown files in a directory.
+        
+        Files are cleaned in parallel across ``jobs`` worker processes
+        (default: one per CPU); ``jobs=1`` processes them sequentially. With
+        the default, batches smaller than MIN_PARALLEL_TASKS are also processed
+        sequentially, as starting workers would cost more than it saves.
+        """
         if not input_dir.exists() or not input_dir.is_dir():
             print(f"Error: Input directory {input_dir} does not exist or is not a directory")
             return 1
         
-        # Find all matching files
-        md_files = list(input_dir.rglob(pattern))
+        # Find all matching files, largest first so big files don't finish last
+        entries = list(_iter_files(str(input_dir), pattern))
+        entries.sort(key=_entry_size, reverse=True)
+        md_files = [Path(entry.path) for entry in entries]
         if not md_files:
             print(f"No files matching pattern '{pattern}' found in {input_dir}")
             return 0
@@ -176,7 +976,8 @@ class MarkdownProcessor:
         if not in_place and output_dir and not dry_run:
             output_dir.mkdir(parents=True, exist_ok=True)
         
-        processed_count = 0
+        tasks = []
+        output_parents = set()
         
         for md_file in md_files:
             if dry_run:
@@ -184,32 +985,87 @@ class MarkdownProcessor:
                 continue
             
             if in_place:
-                # Create backup
+                # Create backup. A hardlink to the resolved file is enough when
+                # process_file renames a new file over it instead of truncating
+                # it, so the backup inode keeps the original content; files it
+                # must rewrite in place get a copy.
                 backup_path = md_file.with_suffix(md_file.suffix + '.bak')
-                shutil.copy2(md_file, backup_path)
+                real_file = Path(os.path.realpath(md_file))
+                if os.path.lexists(backup_path):
+                    backup_path.unlink()
+                linked = False
+                if _replaceable(real_file):
+                    try:
+                        os.link(real_file, backup_path)
+                        linked = True
+                    except OSError:
+                        pass
+                if not linked:
+                    shutil.copy2(real_file, backup_path)
                 if self.verbose:
                     print(f"  Created backup: {backup_path}")
                 
-                success = self.process_file(md_file)
+                tasks.append((md_file, None))
             else:
                 # Calculate relative path and create output path
                 rel_path = md_file.relative_to(input_dir)
                 output_path = output_dir / rel_path if output_dir else md_file.parent / f"cleaned_{md_file.name}"
                 
-                # Ensure output directory exists
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                success = self.process_file(md_file, output_path)
-            
-            if success:
-                processed_count += 1
+                output_parents.add(output_path.parent)
+                tasks.append((md_file, output_path))
+        
+        if dry_run:
+            return 0
         
-        if not dry_run:
-            print(f"Successfully processed {processed_count} files")
+        # Ensure output directories exist, once per directory rather than per file
+        for parent in output_parents:
+            parent.mkdir(parents=True, exist_ok=True)
+        
+        if jobs is None and len(tasks) < MIN_PARALLEL_TASKS:
+            workers = 1
+        else:
+            workers = min(jobs or os.cpu_count() or 1, len(tasks))
+        if workers <= 1:
+            results = [self.process_file(*task) for task in _prefetched(tasks)]
+        else:
+            # Patterns are compiled once per worker process by _init_worker.
+            # Tasks go out in chunks to save IPC round-trips, dealt round-robin
+            # over the size-sorted list so every chunk gets a mix of large and
+            # small files and the largest still start first.
+            chunk_count = min(len(tasks), workers * CHUNKS_PER_WORKER)
+            chunks = [tasks[index::chunk_count] for index in range(chunk_count)]
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_worker,
+                    initargs=(self._worker_config(),)) as executor:
+                results = [success for chunk_results in executor.map(_process_chunk, chunks)
+                           for success in chunk_results]
+        
+        processed_count = sum(1 for success in results if success)
+        print(f"Successfully processed {processed_count} files")
         
         return 0
 
 
+# Processor owned by a pool worker process, built once by _init_worker
+_worker_processor: Optional[MarkdownProcessor] = None
+
+
+def _init_worker(config: Dict) -> None:
+    """Build the per-process processor for a pool worker."""
+    global _worker_processor
+    _worker_processor = MarkdownProcessor(**config)
+
+
+def _process_task(task: Tuple[Path, Optional[Path]]) -> bool:
+    """Process one (input_path, output_path) task in a pool worker."""
+    return _worker_processor.process_file(*task)
+
+
+def _process_chunk(chunk: List[Tuple[Path, Optional[Path]]]) -> List[bool]:
+    """Process a chunk of tasks in a pool worker, prefetching ahead within the chunk."""
+    return [_process_task(task) for task in _prefetched(chunk)]
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -240,6 +1096,10 @@ Examples:
                        help='Verbose output')
     parser.add_argument('--rules', default='default_rules.yaml',
                        help='Path to rules YAML file (default: default_rules.yaml)')
+    parser.add_argument('--engine', choices=ENGINES, default='re',
+                       help='Regex engine for PII matching (default: re)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                       help='Number of worker processes (default: number of CPUs, or 1 for small batches)')
     
     args = parser.parse_args()
     
@@ -250,12 +1110,20 @@ Examples:
     if args.in_place and args.output_dir:
         parser.error("Cannot specify output directory when using --in-place")
     
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    
     # Create processor
-    processor = MarkdownProcessor(
-        rules_file=args.rules,
-        generic_contact=args.contact,
-        verbose=args.verbose
-    )
+    try:
+        processor = MarkdownProcessor(
+            rules_file=args.rules,
+            generic_contact=args.contact,
+            verbose=args.verbose,
+            engine=args.engine
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
     
     # Process files
     return processor.process_directory(
@@ -263,7 +1131,8 @@ Examples:
         output_dir=args.output_dir,
         pattern=args.pattern,
         in_place=args.in_place,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        jobs=args.jobs
     )
 
 
@@ -5,13 +5,21 @@ Test suite for mkdocs_material_prep.py
 Run with: python -m pytest test_mkdocs_material_prep.py -v
 """
 
+import os
 import pytest
 import tempfile
 import shutil
 from pathlib import Path
+import mkdocs_material_prep
 from mkdocs_material_prep import MarkdownProcessor
 
 
+@pytest.fixture(autouse=True)
+def isolated_rules_cache(monkeypatch, tmp_path):
+    """Keep the parsed-rules cache out of the real ~/.cache."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+
+
 class TestMarkdownProcessor:
     """Test cases for the MarkdownProcessor class."""
     
@@ -37,9 +45,10 @@ email: "john@example.com"
 
 This is the body of the document.
 """
-        frontmatter, body = self.processor._extract_frontmatter(content)
+        frontmatter, frontmatter_text, body = self.processor._extract_frontmatter(content)
         
         assert frontmatter is not None
+        assert frontmatter_text == 'title: "Test Document"\nauthor: "John Doe"\nemail: "john@example.com"'
         assert frontmatter['title'] == "Test Document"
         assert frontmatter['author'] == "John Doe"
         assert frontmatter['email'] == "john@example.com"
@@ -48,9 +57,10 @@ This is the body of the document.
     def test_extract_frontmatter_none(self):
         """Test content without frontmatter."""
         content = "# Test Document\n\nThis has no frontmatter."
-        frontmatter, body = self.processor._extract_frontmatter(content)
+        frontmatter, frontmatter_text, body = self.processor._extract_frontmatter(content)
         
         assert frontmatter is None
+        assert frontmatter_text is None
         assert body == content
     
     def test_extract_frontmatter_invalid(self):
@@ -62,10 +72,11 @@ invalid: yaml: content
 
 # Test Content
 """
-        frontmatter, body = self.processor._extract_frontmatter(content)
+        frontmatter, frontmatter_text, body = self.processor._extract_frontmatter(content)
         
         # Should return None for invalid YAML
         assert frontmatter is None
+        assert frontmatter_text is None
         assert body == content
     
     def test_clean_frontmatter(self):
@@ -79,9 +90,10 @@ invalid: yaml: content
             'version': '1.0'
         }
         
-        cleaned = self.processor._clean_frontmatter(frontmatter)
+        cleaned, changed = self.processor._clean_frontmatter(frontmatter)
         
         # Should remove PII fields but keep others
+        assert changed
         assert 'title' in cleaned
         assert 'description' in cleaned
         assert 'version' in cleaned
@@ -91,11 +103,15 @@ invalid: yaml: content
     
     def test_clean_frontmatter_empty(self):
         """Test cleaning empty frontmatter."""
-        cleaned = self.processor._clean_frontmatter(None)
-        assert cleaned == {}
+        assert self.processor._clean_frontmatter(None) == ({}, False)
+        assert self.processor._clean_frontmatter({}) == ({}, False)
+    
+    def test_clean_frontmatter_unchanged(self):
+        """Test that frontmatter without PII fields is reported unchanged."""
+        cleaned, changed = self.processor._clean_frontmatter({'title': 'Test', 'summary': 'By author'})
         
-        cleaned = self.processor._clean_frontmatter({})
-        assert cleaned == {}
+        assert cleaned == {'title': 'Test', 'summary': 'By author'}
+        assert not changed
     
     def test_clean_content_email_replacement(self):
         """Test replacing email addresses in content."""
@@ -126,6 +142,38 @@ invalid: yaml: content
         assert "+1-555-111-2222" not in cleaned
         assert "[REDACTED]" in cleaned
     
+    def test_clean_content_phone_false_positives(self):
+        """Test that placeholder and invalid NANP numbers are not redacted."""
+        content = "Example 123-456-7890, area 295-555-0100, real 555-123-4567."
+        
+        cleaned = self.processor._clean_content(content)
+        
+        assert "123-456-7890" in cleaned
+        assert "295-555-0100" in cleaned
+        assert "555-123-4567" not in cleaned
+    
+    def test_clean_content_ip_false_positives(self):
+        """Test that version strings and non-identifying addresses are not redacted."""
+        content = "Version 1.2.3.400 on 127.0.0.1 and 192.0.2.10; internal 10.1.2.3 and 8.8.8.8."
+        
+        cleaned = self.processor._clean_content(content)
+        
+        assert "1.2.3.400" in cleaned
+        assert "127.0.0.1" in cleaned
+        assert "192.0.2.10" in cleaned
+        assert "10.1.2.3" not in cleaned
+        assert "8.8.8.8" not in cleaned
+    
+    def test_clean_content_ssn_false_positives(self):
+        """Test that never-issued SSN numbers are not redacted."""
+        content = "Part 000-12-3456, 666-12-3456, 912-34-5678, 123-00-4567; real 123-45-6789."
+        
+        cleaned = self.processor._clean_content(content)
+        
+        for part in ("000-12-3456", "666-12-3456", "912-34-5678", "123-00-4567"):
+            assert part in cleaned
+        assert "123-45-6789" not in cleaned
+    
     def test_clean_content_multiple_patterns(self):
         """Test cleaning content with multiple PII patterns."""
         content = """
@@ -145,6 +193,70 @@ invalid: yaml: content
         assert "192.168.1.100" not in cleaned
         assert "[REDACTED]" in cleaned
     
+    def test_fused_pattern_dispatch(self):
+        """Test that all patterns are fused into one alternation."""
+        fused = self.processor._fused
+        
+        assert fused.groups >= len(self.processor.rules['pii_patterns'])
+        assert sorted(self.processor._pattern_names.values()) == sorted(self.processor.rules['pii_patterns'])
+        
+        email = fused.search("mail john@company.com")
+        assert self.processor._pattern_names[email.lastgroup] == 'email'
+        assert self.processor._dispatch(email) == "contact@example.com"
+        
+        phone = fused.search("call 555-123-4567")
+        assert self.processor._dispatch(phone) == "[REDACTED]"
+    
+    def test_unfusable_rules_matched_separately(self):
+        """Test that rules with backrefs or global flags keep their meaning."""
+        processor = MarkdownProcessor(rules={'pii_patterns': {
+            'email': r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}',
+            'dup': r'(\d)\1\1',
+            'badge': r'(?i)badge-\d+',
+        }})
+        
+        assert [processor._pattern_names[group] for group, _ in processor._separate] == ['dup', 'badge']
+        assert processor._fused_bytes is None
+        assert processor._clean_content("PIN 777, BADGE-42, a@b.com") == \
+            "PIN [REDACTED], [REDACTED], contact@example.com"
+        assert processor._clean_content("PIN 778") == "PIN 778"
+    
+    def test_invalid_pattern_reported(self):
+        """Test that an invalid rule fails with its name."""
+        with pytest.raises(ValueError, match="Invalid PII pattern 'broken'"):
+            MarkdownProcessor(rules={'pii_patterns': {'broken': r'(unclosed'}})
+    
+    def test_clean_content_verbose_counts(self, capsys):
+        """Test that verbose mode reports per-pattern match counts."""
+        content = "Mail a@company.com or b@company.com, call 555-123-4567."
+        
+        cleaned = self.processor._clean_content(content)
+        
+        output = capsys.readouterr().out
+        assert "Found 2 email pattern(s)" in output
+        assert "Found 1 phone pattern(s)" in output
+        assert cleaned == "Mail contact@example.com or contact@example.com, call [REDACTED]."
+    
+    def test_clean_content_no_pii_unchanged(self):
+        """Test that content without PII is returned as the same object."""
+        content = "# Guide\n\nNothing sensitive in here.\n" * 50
+        
+        assert self.processor._clean_content(content) is content
+    
+    def test_clean_content_no_patterns(self):
+        """Test that content passes through when no PII patterns are configured."""
+        rules_file = self.temp_dir / "rules.yaml"
+        rules_file.write_text("pii_patterns: {}\nfrontmatter_remove: []\n")
+        processor = MarkdownProcessor(rules_file=str(rules_file))
+        
+        content = "Contact john@example.com"
+        assert processor._clean_content(content) is content
+        assert processor._clean_frontmatter({'author': 'John'}) == ({'author': 'John'}, False)
+        assert processor._clean_frontmatter(None) == ({}, False)
+        
+        markdown = "---\nauthor: John\n---\nMail john@example.com\n"
+        assert processor._clean_markdown(markdown) == markdown
+    
     def test_reconstruct_markdown_with_frontmatter(self):
         """Test reconstructing markdown with frontmatter."""
         frontmatter = {'title': 'Test', 'version': '1.0'}
@@ -157,6 +269,23 @@ invalid: yaml: content
         assert "version: '1.0'" in result
         assert result.endswith("---\n# Test Content\n\nBody text.")
     
+    def test_reconstruct_markdown_reuses_buffer(self):
+        """Test that consecutive dumps through the shared buffer don't leak into each other."""
+        first = self.processor._reconstruct_markdown({'title': 'A much longer first title'}, "One")
+        second = self.processor._reconstruct_markdown({'title': 'B'}, "Two")
+        
+        assert first == "---\ntitle: A much longer first title\n---\nOne"
+        assert second == "---\ntitle: B\n---\nTwo"
+    
+    def test_reconstruct_markdown_unchanged_frontmatter(self):
+        """Test that unchanged frontmatter is re-emitted verbatim."""
+        frontmatter_text = 'title: "Test"\nsummary: "Written by the author"'
+        content = "---\n" + frontmatter_text + "\n---\n# Body\n"
+        
+        result = self.processor._clean_markdown(content)
+        
+        assert result == content
+    
     def test_reconstruct_markdown_without_frontmatter(self):
         """Test reconstructing markdown without frontmatter."""
         content = "# Test Content\n\nBody text."
@@ -220,11 +349,95 @@ This document contains no PII.
         assert success
         assert output_file.exists()
         
-        # Content should be mostly unchanged (except formatting)
+        # Frontmatter without PII fields is kept verbatim
         processed_content = output_file.read_text()
-        assert "title: Clean Document" in processed_content
-        assert "version: '1.0'" in processed_content
-        assert "This document contains no PII." in processed_content
+        assert processed_content == content
+    
+    def test_process_file_frontmatter_fast_path(self, monkeypatch):
+        """Test that frontmatter without PII fields is not parsed."""
+        def fail_load(*args, **kwargs):
+            raise AssertionError("frontmatter should not be parsed")
+        
+        test_file = self.temp_dir / "test.md"
+        test_file.write_text('---\ntitle:   "Quoted"\ntags: [a, b]\n---\nCall 555-123-4567\n')
+        
+        monkeypatch.setattr(mkdocs_material_prep.yaml, "load", fail_load)
+        output_file = self.temp_dir / "output.md"
+        success = self.processor.process_file(test_file, output_file)
+        
+        assert success
+        assert output_file.read_text() == '---\ntitle:   "Quoted"\ntags: [a, b]\n---\nCall [REDACTED]\n'
+    
+    def test_process_file_invalid_frontmatter_with_pii(self):
+        """Test that PII in invalid frontmatter without removable fields is still cleaned."""
+        test_file = self.temp_dir / "test.md"
+        test_file.write_text("---\ntitle: Doc\nreach: call: 555-123-4567 or john@company.com\n---\nBody\n")
+        
+        output_file = self.temp_dir / "output.md"
+        success = self.processor.process_file(test_file, output_file)
+        
+        assert success
+        assert output_file.read_text() == (
+            "---\ntitle: Doc\nreach: call: [REDACTED] or contact@example.com\n---\nBody\n"
+        )
+    
+    def test_process_file_list_frontmatter(self):
+        """Test that frontmatter which is a YAML list is kept and the body still cleaned."""
+        test_file = self.temp_dir / "test.md"
+        test_file.write_text("---\n- author: x\n- b\n---\nCall 555-123-4567\n")
+        
+        output_file = self.temp_dir / "output.md"
+        success = self.processor.process_file(test_file, output_file)
+        
+        assert success
+        assert output_file.read_text() == "---\n- author: x\n- b\n---\nCall [REDACTED]\n"
+    
+    def test_has_removable_fields(self):
+        """Test the substring pre-check for removable frontmatter fields."""
+        assert self.processor._has_removable_fields('title: Doc\nauthor: John')
+        assert self.processor._has_removable_fields('"author" : John')
+        assert self.processor._has_removable_fields('meta: {email: a@b.com}')
+        assert not self.processor._has_removable_fields('title: Doc\nversion: 1.0')
+    
+    def test_process_file_large_mmap(self):
+        """Test that large files are cleaned through the memory-mapped bytes path."""
+        test_file = self.temp_dir / "large.md"
+        body = "Contact john@company.com, call 555-123-4567. Nothing else here.\n"
+        content = "---\ntitle: Large\nauthor: John Doe\n---\n" + body * 2000
+        test_file.write_text(content)
+        assert test_file.stat().st_size >= mkdocs_material_prep.MMAP_THRESHOLD
+        
+        assert self.processor._clean_mapped(test_file) is not None
+        
+        output_file = self.temp_dir / "output.md"
+        success = self.processor.process_file(test_file, output_file)
+        
+        assert success
+        processed_content = output_file.read_text(encoding='utf-8')
+        assert processed_content == self.processor._clean_markdown(content)
+        assert processed_content.startswith("---\ntitle: Large\n---\nContact contact@example.com, call [REDACTED].")
+        assert "John Doe" not in processed_content
+        
+        # Non-ASCII whitespace only matches \s in str patterns, so such files use the text path
+        nbsp_line = "Call 555\u00a0123\u00a04567 today.\n"
+        test_file.write_text(nbsp_line * 3000, encoding='utf-8')
+        assert test_file.stat().st_size >= mkdocs_material_prep.MMAP_THRESHOLD
+        assert self.processor._clean_mapped(test_file) is None
+        
+        assert self.processor.process_file(test_file, output_file)
+        assert output_file.read_text(encoding='utf-8') == "Call [REDACTED] today.\n" * 3000
+    
+    def test_process_file_large_crlf(self):
+        """Test that large CRLF files fall back to the text path."""
+        test_file = self.temp_dir / "large.md"
+        content = "---\r\nauthor: John Doe\r\n---\r\n" + "Call 555-123-4567\r\n" * 5000
+        test_file.write_bytes(content.encode('utf-8'))
+        
+        assert self.processor._clean_mapped(test_file) is None
+        
+        output_file = self.temp_dir / "output.md"
+        assert self.processor.process_file(test_file, output_file)
+        assert output_file.read_bytes() == b"Call [REDACTED]\n" * 5000
     
     def test_process_file_in_place(self):
         """Test processing a file in-place."""
@@ -295,6 +508,142 @@ Contact john@example.com
         backup_content = backup_file.read_text()
         assert "author: John" in backup_content
     
+    def test_process_directory_in_place_hardlink_backup(self):
+        """Test that hardlinked backups survive rewriting the original."""
+        test_file = self.temp_dir / "test.md"
+        original = "---\nauthor: John\n---\nCall 555-123-4567\n"
+        test_file.write_text(original)
+        test_file.chmod(0o640)
+        stale_backup = self.temp_dir / "test.md.bak"
+        stale_backup.write_text("stale")
+        
+        result = self.processor.process_directory(self.temp_dir, in_place=True, jobs=1)
+        
+        assert result == 0
+        assert stale_backup.read_text() == original
+        assert test_file.read_text() == "Call [REDACTED]\n"
+        assert test_file.stat().st_ino != stale_backup.stat().st_ino
+        assert test_file.stat().st_mode & 0o777 == 0o640
+        assert not list(self.temp_dir.glob(".test.md.*.tmp"))
+    
+    def test_process_directory_in_place_symlink(self):
+        """Test that in-place cleaning keeps symlinks and rewrites their targets."""
+        docs_dir = self.temp_dir / "docs"
+        shared_dir = self.temp_dir / "shared"
+        docs_dir.mkdir()
+        shared_dir.mkdir()
+        target = shared_dir / "page.md"
+        original = "Call 555-123-4567\n"
+        target.write_text(original)
+        link = docs_dir / "page.md"
+        link.symlink_to(target)
+        
+        result = self.processor.process_directory(docs_dir, in_place=True, jobs=1)
+        
+        assert result == 0
+        assert link.is_symlink()
+        assert target.read_text() == "Call [REDACTED]\n"
+        assert (docs_dir / "page.md.bak").read_text() == original
+        assert not list(shared_dir.glob(".page.md.*.tmp"))
+    
+    def test_process_directory_in_place_unreplaceable(self, monkeypatch):
+        """Test that files which cannot be renamed over are backed up by copy and rewritten."""
+        monkeypatch.setattr(mkdocs_material_prep, "_replaceable", lambda path, links=1: False)
+        test_file = self.temp_dir / "test.md"
+        original = "Call 555-123-4567\n"
+        test_file.write_text(original)
+        inode = test_file.stat().st_ino
+        
+        result = self.processor.process_directory(self.temp_dir, in_place=True, jobs=1)
+        
+        assert result == 0
+        assert test_file.read_text() == "Call [REDACTED]\n"
+        assert test_file.stat().st_ino == inode
+        assert (self.temp_dir / "test.md.bak").read_text() == original
+    
+    def test_process_directory_in_place_shared_hardlink(self):
+        """Test that files with other hard links are rewritten in place, keeping the links shared."""
+        test_file = self.temp_dir / "test.md"
+        original = "Call 555-123-4567\n"
+        test_file.write_text(original)
+        other_dir = self.temp_dir / "elsewhere"
+        other_dir.mkdir()
+        other_link = other_dir / "linked.txt"
+        os.link(test_file, other_link)
+        
+        result = self.processor.process_directory(self.temp_dir, in_place=True, jobs=1)
+        
+        assert result == 0
+        assert test_file.read_text() == "Call [REDACTED]\n"
+        assert os.path.samefile(test_file, other_link)
+        assert (self.temp_dir / "test.md.bak").read_text() == original
+    
+    def test_process_file_in_place_read_only(self):
+        """Test that read-only files are not replaced behind the permission."""
+        if hasattr(os, "geteuid") and os.geteuid() == 0:
+            pytest.skip("root can write read-only files")
+        test_file = self.temp_dir / "test.md"
+        test_file.write_text("Call 555-123-4567\n")
+        test_file.chmod(0o444)
+        
+        assert not self.processor.process_file(test_file)
+        assert test_file.read_text() == "Call 555-123-4567\n"
+    
+    def test_process_directory_parallel(self):
+        """Test processing a directory across worker processes."""
+        for i in range(8):
+            subdir = self.temp_dir / f"section{i % 3}"
+            subdir.mkdir(exist_ok=True)
+            (subdir / f"page{i}.md").write_text(f"---\nauthor: John\n---\nCall 555-123-45{i:02d}\n")
+        
+        output_dir = self.temp_dir / "output"
+        result = self.processor.process_directory(self.temp_dir, output_dir, jobs=2)
+        
+        assert result == 0
+        for i in range(8):
+            processed = (output_dir / f"section{i % 3}" / f"page{i}.md").read_text()
+            assert processed == "Call [REDACTED]\n"
+    
+    def test_process_directory_sequential(self):
+        """Test that jobs=1 processes files in the calling process."""
+        (self.temp_dir / "file1.md").write_text("Contact john@example.com")
+        (self.temp_dir / "file2.md").write_text("# Clean file")
+        
+        output_dir = self.temp_dir / "output"
+        result = self.processor.process_directory(self.temp_dir, output_dir, jobs=1)
+        
+        assert result == 0
+        assert (output_dir / "file1.md").read_text() == "Contact contact@example.com"
+        assert (output_dir / "file2.md").read_text() == "# Clean file"
+    
+    def test_process_directory_small_batch_skips_pool(self, monkeypatch):
+        """Test that small batches are processed without a pool when jobs is not given."""
+        def no_pool(*args, **kwargs):
+            raise AssertionError("process pool started for a small batch")
+        
+        monkeypatch.setattr(mkdocs_material_prep.concurrent.futures, "ProcessPoolExecutor", no_pool)
+        for i in range(3):
+            (self.temp_dir / f"file{i}.md").write_text("Call 555-123-4567\n")
+        
+        output_dir = self.temp_dir / "output"
+        result = self.processor.process_directory(self.temp_dir, output_dir)
+        
+        assert result == 0
+        assert (output_dir / "file2.md").read_text() == "Call [REDACTED]\n"
+    
+    def test_process_directory_largest_first(self, capsys):
+        """Test that files are scheduled largest first."""
+        (self.temp_dir / "small.md").write_text("x")
+        (self.temp_dir / "large.md").write_text("x" * 1000)
+        (self.temp_dir / "medium.md").write_text("x" * 100)
+        
+        result = self.processor.process_directory(self.temp_dir, self.temp_dir / "output", dry_run=True)
+        
+        assert result == 0
+        listed = [line.rsplit("/", 1)[-1] for line in capsys.readouterr().out.splitlines()
+                  if line.startswith("Would process:")]
+        assert listed == ["large.md", "medium.md", "small.md"]
+    
     def test_process_directory_custom_pattern(self):
         """Test processing directory with custom file pattern."""
         # Create test files
@@ -314,6 +663,70 @@ Contact john@example.com
         assert not (output_dir / "file1.md").exists()
         assert not (output_dir / "file3.txt").exists()
     
+    def test_iter_files(self):
+        """Test the recursive scandir-based file walker."""
+        from mkdocs_material_prep import _iter_files
+        
+        (self.temp_dir / "a.md").write_text("a")
+        (self.temp_dir / "b.txt").write_text("b")
+        (self.temp_dir / "nested" / "deeper").mkdir(parents=True)
+        (self.temp_dir / "nested" / "c.md").write_text("c")
+        (self.temp_dir / "nested" / "deeper" / "d.md").write_text("d")
+        (self.temp_dir / "dir.md").mkdir()
+        
+        found = sorted(Path(entry.path).relative_to(self.temp_dir).as_posix()
+                       for entry in _iter_files(str(self.temp_dir), "*.md"))
+        
+        assert found == ["a.md", "nested/c.md", "nested/deeper/d.md"]
+        
+        for pattern in ["nested/*.md", "deeper/*.md", "nested/*/*.md"]:
+            found = sorted(Path(entry.path).relative_to(self.temp_dir).as_posix()
+                           for entry in _iter_files(str(self.temp_dir), pattern))
+            expected = sorted(path.relative_to(self.temp_dir).as_posix()
+                              for path in self.temp_dir.rglob(pattern) if path.is_file())
+            assert found == expected, pattern
+        assert [Path(entry.path).name for entry in _iter_files(str(self.temp_dir), "nested/*.md")] == ["c.md"]
+    
+    def test_write_bytes_fast(self):
+        """Test writing bytes directly through a file descriptor."""
+        from mkdocs_material_prep import _write_bytes_fast
+        
+        target = self.temp_dir / "out.md"
+        target.write_bytes(b"previous, longer content")
+        
+        _write_bytes_fast(target, "Caf\u00e9\n".encode('utf-8'))
+        
+        assert target.read_bytes() == b"Caf\xc3\xa9\n"
+    
+    def test_prefetch_files(self):
+        """Test that readahead hints tolerate missing files."""
+        from mkdocs_material_prep import _prefetch_files
+        
+        if not hasattr(os, "posix_fadvise"):
+            pytest.skip("posix_fadvise not available")
+        
+        existing = self.temp_dir / "a.md"
+        existing.write_text("a")
+        
+        _prefetch_files([existing, self.temp_dir / "missing.md"])
+        assert existing.read_text() == "a"
+    
+    def test_prefetched_window(self, monkeypatch):
+        """Test that readahead hints stay a bounded window ahead of processing."""
+        if not hasattr(os, "posix_fadvise"):
+            pytest.skip("posix_fadvise not available")
+        
+        hinted = []
+        monkeypatch.setattr(mkdocs_material_prep, "_prefetch_files", hinted.extend)
+        window = mkdocs_material_prep.PREFETCH_WINDOW
+        tasks = [(Path(f"file{i}.md"), None) for i in range(window * 3)]
+        
+        for index, task in enumerate(mkdocs_material_prep._prefetched(tasks)):
+            assert task == tasks[index]
+            assert len(hinted) <= index + window + 1
+        
+        assert hinted == [task[0] for task in tasks[1:]]
+    
     def test_process_directory_dry_run(self):
         """Test dry run functionality."""
         # Create test file
@@ -360,6 +773,106 @@ Contact john@example.com
         assert "john@example.com" not in cleaned
         assert "support@mycompany.com" in cleaned
     
+    def test_re2_engine(self):
+        """Test cleaning content with the re2 engine."""
+        pytest.importorskip("re2")
+        processor = MarkdownProcessor(engine="re2")
+        
+        content = "Contact john@example.com or call 555-123-4567."
+        cleaned = processor._clean_content(content)
+        
+        assert processor.engine == "re2"
+        assert cleaned == self.processor._clean_content(content)
+        assert "john@example.com" not in cleaned
+        assert "555-123-4567" not in cleaned
+    
+    @pytest.mark.parametrize("engine", ["re2", "hyperscan"])
+    def test_engine_matches_re_on_unicode(self, engine):
+        """Test that optional engines redact non-ASCII text exactly as re does."""
+        pytest.importorskip(engine)
+        processor = MarkdownProcessor(engine=engine)
+        assert processor.engine == engine
+        
+        for content in ["Call 555\u00a0123\u00a04567 today.",
+                        "---\ntitle: Call 555\u00a0123\u00a04567\n---\nBody\n"]:
+            assert processor._clean_markdown(content) == self.processor._clean_markdown(content)
+        assert processor._clean_content("Call 555\u00a0123\u00a04567") == "Call [REDACTED]"
+        
+        test_file = self.temp_dir / "large.md"
+        test_file.write_text("Call 555\u00a0123\u00a04567 today.\n" * 3000, encoding='utf-8')
+        assert processor._clean_mapped(test_file) is None
+        assert processor.process_file(test_file, self.temp_dir / "output.md")
+        assert (self.temp_dir / "output.md").read_text(encoding='utf-8') == "Call [REDACTED] today.\n" * 3000
+    
+    def test_re2_engine_unavailable(self, monkeypatch):
+        """Test falling back to re when re2 is not installed."""
+        monkeypatch.setattr(mkdocs_material_prep, "re2", None)
+        processor = MarkdownProcessor(engine="re2")
+        
+        assert processor.engine == "re"
+        assert "[REDACTED]" in processor._clean_content("Call 555-123-4567")
+    
+    def test_hyperscan_engine(self):
+        """Test cleaning content with the hyperscan engine."""
+        pytest.importorskip("hyperscan")
+        processor = MarkdownProcessor(engine="hyperscan")
+        
+        content = "Café contact: john@example.com, SSN 123-45-6789, call 555-123-4567, éa@b.com."
+        cleaned = processor._clean_content(content)
+        
+        assert processor.engine == "hyperscan"
+        assert cleaned == self.processor._clean_content(content)
+        assert cleaned.startswith("Café contact: contact@example.com")
+        # é is a word character, so there is no \b before the "a"
+        assert cleaned.endswith("call [REDACTED], éa@b.com.")
+    
+    def test_hyperscan_engine_overlapping_matches(self):
+        """Test that hyperscan finds matches starting inside an earlier match, as re does."""
+        pytest.importorskip("hyperscan")
+        processor = MarkdownProcessor(engine="hyperscan")
+        
+        for content in ["a@b.com.c@d.com", "x a@b.com.c@d.com.e@f.org y", "Café a@b.com.c@d.com"]:
+            assert processor._clean_content(content) == self.processor._clean_content(content)
+            assert processor._clean_content_bytes(content.encode('utf-8')) == \
+                self.processor._clean_content(content).encode('utf-8')
+    
+    def test_hyperscan_bytes_scanned_once(self):
+        """Test that the search probe and sub share one scan of a bytes body."""
+        pytest.importorskip("hyperscan")
+        processor = MarkdownProcessor(engine="hyperscan")
+        pattern = processor._fused_bytes
+        scans = []
+        
+        class CountingDatabase:
+            def __init__(self, db):
+                self._db = db
+            
+            def scan(self, data, **kwargs):
+                scans.append(len(data))
+                return self._db.scan(data, **kwargs)
+        
+        pattern._db = CountingDatabase(pattern._db)
+        body = b"Call 555-123-4567, mail john@company.com.\n" * 100
+        with memoryview(body) as view:
+            cleaned = processor._clean_content_bytes(view)
+        
+        assert cleaned == self.processor._clean_content(body.decode()).encode()
+        assert len(scans) == 1
+        assert pattern._last_data is None
+    
+    def test_hyperscan_engine_unavailable(self, monkeypatch):
+        """Test falling back to re when hyperscan is not installed."""
+        monkeypatch.setattr(mkdocs_material_prep, "hyperscan", None)
+        processor = MarkdownProcessor(engine="hyperscan")
+        
+        assert processor.engine == "re"
+        assert "[REDACTED]" in processor._clean_content("Call 555-123-4567")
+    
+    def test_unknown_engine(self):
+        """Test that an unknown regex engine is rejected."""
+        with pytest.raises(ValueError):
+            MarkdownProcessor(engine="pcre")
+    
     def test_load_rules_file_not_found(self):
         """Test loading rules when file doesn't exist."""
         processor = MarkdownProcessor(rules_file="nonexistent.yaml")
@@ -368,6 +881,39 @@ Contact john@example.com
         assert 'pii_patterns' in processor.rules
         assert 'email' in processor.rules['pii_patterns']
     
+    def test_load_rules_cached(self, monkeypatch):
+        """Test that parsed rules are cached and invalidated on change."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(self.temp_dir / "cache"))
+        rules_file = self.temp_dir / "rules.yaml"
+        rules_file.write_text("pii_patterns:\n  ssn: '\\d{3}-\\d{2}-\\d{4}'\n")
+        
+        first = MarkdownProcessor(rules_file=str(rules_file))
+        cache_files = list((self.temp_dir / "cache" / "mkdocs_material_prep").glob("rules-*.pkl"))
+        assert len(cache_files) == 1
+        
+        second = MarkdownProcessor(rules_file=str(rules_file))
+        assert second.rules == first.rules
+        
+        rules_file.write_text("pii_patterns:\n  phone: '\\d{3}-\\d{4}'\n")
+        os.utime(rules_file, ns=(0, 0))
+        third = MarkdownProcessor(rules_file=str(rules_file))
+        assert list(third.rules['pii_patterns']) == ['phone']
+        cache_files = list((self.temp_dir / "cache" / "mkdocs_material_prep").iterdir())
+        assert len(cache_files) == 1
+    
+    def test_write_rules_cache_failure_cleans_up(self, monkeypatch):
+        """Test that a failed cache write leaves no temp file behind."""
+        cache_dir = self.temp_dir / "cache"
+        monkeypatch.setenv("XDG_CACHE_HOME", str(cache_dir))
+        
+        def fail_replace(src, dst):
+            raise OSError("disk full")
+        
+        monkeypatch.setattr(mkdocs_material_prep.os, "replace", fail_replace)
+        self.processor._write_rules_cache(cache_dir / "mkdocs_material_prep" / "rules-a-b.pkl", {'pii_patterns': {}})
+        
+        assert list((cache_dir / "mkdocs_material_prep").iterdir()) == []
+    
     def test_load_rules_invalid_yaml(self):
         """Test loading invalid YAML rules file."""
         # Create invalid YAML file